@@ -1,92 +1,505 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-from sklearn.metrics.pairwise import cosine_similarity
-from openai import AzureOpenAI
+import hashlib
+import heapq
 import os
+import tempfile
+from io import BytesIO
+from operator import itemgetter
+from string import Template
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 
-BANKING_PRODUCTS = [
-    {
-        "name": "basic_checking_account",
-        "description": "A no-frills checking account with low fees.",
-        "category": "account",
-    },
-    {
-        "name": "premium_checking_account",
-        "description": "A high-tier checking account with benefits like cashback and no ATM fees.",
-        "category": "account",
-    },
-    {
-        "name": "savings_account",
-        "description": "A standard savings account with competitive interest rates.",
-        "category": "account",
-    },
-    {
-        "name": "high_yield_savings_account",
-        "description": "A savings account with higher interest rates for larger balances.",
-        "category": "account",
-    },
-    {
-        "name": "credit_card",
-        "description": "A standard credit card with rewards on everyday purchases.",
-        "category": "credit",
-    },
-    {
-        "name": "platinum_credit_card",
-        "description": "A premium credit card with travel rewards and concierge services.",
-        "category": "credit",
-    },
-    {
-        "name": "personal_loan",
-        "description": "A loan for personal expenses with flexible repayment terms.",
-        "category": "loan",
-    },
-    {
-        "name": "low_interest_loan",
-        "description": "A loan with lower interest rates for qualified customers.",
-        "category": "loan",
-    },
-    {
-        "name": "investment_account",
-        "description": "An account for investing in stocks, bonds, and mutual funds.",
-        "category": "investment",
-    },
-    {
-        "name": "retirement_account",
-        "description": "A tax-advantaged account for retirement savings.",
-        "category": "investment",
-    },
-]
+BANKING_PRODUCTS = tuple(
+    MappingProxyType(product)
+    for product in [
+        {
+            "name": "basic_checking_account",
+            "description": "A no-frills checking account with low fees.",
+            "category": "account",
+        },
+        {
+            "name": "premium_checking_account",
+            "description": "A high-tier checking account with benefits like cashback and no ATM fees.",
+            "category": "account",
+        },
+        {
+            "name": "savings_account",
+            "description": "A standard savings account with competitive interest rates.",
+            "category": "account",
+        },
+        {
+            "name": "high_yield_savings_account",
+            "description": "A savings account with higher interest rates for larger balances.",
+            "category": "account",
+        },
+        {
+            "name": "credit_card",
+            "description": "A standard credit card with rewards on everyday purchases.",
+            "category": "credit",
+        },
+        {
+            "name": "platinum_credit_card",
+            "description": "A premium credit card with travel rewards and concierge services.",
+            "category": "credit",
+        },
+        {
+            "name": "personal_loan",
+            "description": "A loan for personal expenses with flexible repayment terms.",
+            "category": "loan",
+        },
+        {
+            "name": "low_interest_loan",
+            "description": "A loan with lower interest rates for qualified customers.",
+            "category": "loan",
+        },
+        {
+            "name": "investment_account",
+            "description": "An account for investing in stocks, bonds, and mutual funds.",
+            "category": "investment",
+        },
+        {
+            "name": "retirement_account",
+            "description": "A tax-advantaged account for retirement savings.",
+            "category": "investment",
+        },
+    ]
+)
+_BANKING_PRODUCT_NAMES = tuple(product["name"] for product in BANKING_PRODUCTS)
+
+
+# Explicit column types skip dtype inference and keep string columns compact.
+# The pyarrow reader wraps out-of-range integers silently instead of raising,
+# so the integer widths leave ample headroom over any realistic value. The
+# nullable integer types keep blank cells as NA instead of rejecting the file
+TRANSACTION_DTYPES = {
+    "customer_ID": "Int64",
+    "transaction_type": "category",
+    # Money is only displayed, and float32 cannot hold cents above 2**17
+    "transaction_amount": "float64",
+    "product_used": "category",
+    "customer_tenure": "Int16",
+    "transaction_frequency": "Int32",
+}
+
+# Retry budget and per-request timeout for Azure OpenAI calls
+LLM_MAX_RETRIES = 4
+LLM_TIMEOUT_SECONDS = 30.0
+
+# Opt-in: when set, parsed uploads are persisted here so new sessions can skip
+# the CSV parse, keeping only the most recently used uploads. Bump the version
+# whenever the layout of the cached artifacts changes
+ARTIFACT_CACHE_VERSION = 5
+ARTIFACT_CACHE_DIR = os.environ.get("RECOMMENDER_CACHE_DIR")
+ARTIFACT_CACHE_MAX_UPLOADS = int(os.environ.get("RECOMMENDER_CACHE_MAX_UPLOADS", "4"))
+_ARTIFACT_SUFFIXES = (".transactions.parquet", ".customer_stats.parquet", ".matrix.npz")
+
+
+def _compute_customer_stats(
+    transaction_data, customer_product_matrix, customers, products
+):
+    """Per-customer profile figures used by the UI and the message prompt"""
+    # Means skip blank cells; a customer with none left gets NaN, as before
+    customer_stats = (
+        transaction_data.groupby("customer_ID", sort=False)
+        .agg(
+            tenure=("customer_tenure", "mean"),
+            freq=("transaction_frequency", "mean"),
+        )
+        .astype("float64")
+    )
+    # The most used product is the row-wise argmax of the transaction counts;
+    # products are sorted, so ties resolve the same way mode()[0] did.
+    # Customers whose rows all lack a product have no favourite to report
+    favorite = np.asarray(customer_product_matrix.argmax(axis=1)).ravel()
+    fav = np.where(
+        np.diff(customer_product_matrix.indptr) > 0, products[favorite], "N/A"
+    )
+    customer_stats["fav"] = pd.Series(fav, index=customers)
+    return customer_stats
+
+
+def _rank_by_popularity(products):
+    """Product labels by descending count, ties in order of first appearance"""
+    # Categorical value_counts would break ties alphabetically; the original
+    # object-dtype value_counts kept first-appearance order, so match that
+    codes, first_seen, counts = np.unique(
+        products.codes, return_index=True, return_counts=True
+    )
+    present = codes >= 0
+    order = np.lexsort((first_seen[present], -counts[present]))
+    return products.categories[codes[present][order]].tolist()
+
+
+def _build_matrix(transaction_data):
+    """Sparse customer-product counts with the label and row lookups built alongside"""
+    # Deferred so the UI import path only pays for scipy once data arrives
+    from scipy import sparse
+
+    customers = pd.Categorical(transaction_data["customer_ID"])
+    # product_used is read as a category with sorted categories, so its codes
+    # already index the matrix columns without a second factorize
+    products = transaction_data["product_used"].array
+    # Transaction counts per (customer, product); customers only touch a few
+    # products so the matrix is kept sparse. Duplicate pairs are collapsed on
+    # a single int64 pair code first, which is cheaper than letting the sparse
+    # constructor sum one entry per transaction. Counts are exact in int32.
+    # Missing products have code -1 and would spill into the previous
+    # customer's last column, so drop those rows as pivot_table did
+    n_products = len(products.categories)
+    known = (customers.codes >= 0) & (products.codes >= 0)
+    pair_codes, counts = np.unique(
+        customers.codes[known].astype(np.int64) * n_products + products.codes[known],
+        return_counts=True,
+    )
+    customer_product_matrix = sparse.csr_matrix(
+        (counts.astype(np.int32), np.divmod(pair_codes, n_products)),
+        shape=(len(customers.categories), n_products),
+    )
+    return {
+        "customer_product_matrix": customer_product_matrix,
+        "customers": customers.categories,
+        # Plain array so ranked product codes map back to labels without Index overhead
+        "products": products.categories.to_numpy(),
+        # Cold-start ranking only changes with the data, so rank once per load
+        "popular_products": _rank_by_popularity(products),
+        # Row positions of each customer's transactions, grouped by customer code;
+        # customer i owns row_order[row_offsets[i] : row_offsets[i + 1]]
+        "row_order": np.argsort(customers.codes, kind="stable"),
+        "row_offsets": np.concatenate(([0], np.cumsum(np.bincount(customers.codes)))),
+    }
+
+
+def _save_matrix(matrix_data, path):
+    """Write _build_matrix output to an .npz so readers never see a partial file"""
+    customer_product_matrix = matrix_data["customer_product_matrix"]
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+    os.close(fd)
+    try:
+        np.savez(
+            tmp_path,
+            data=customer_product_matrix.data,
+            indices=customer_product_matrix.indices,
+            indptr=customer_product_matrix.indptr,
+            shape=customer_product_matrix.shape,
+            customers=matrix_data["customers"].to_numpy(),
+            products=matrix_data["products"].astype(str),
+            popular_products=np.asarray(matrix_data["popular_products"], dtype=str),
+            row_order=matrix_data["row_order"],
+            row_offsets=matrix_data["row_offsets"],
+        )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_matrix(path):
+    """Read back an .npz written by _save_matrix"""
+    from scipy import sparse
+
+    with np.load(path) as npz:
+        return {
+            "customer_product_matrix": sparse.csr_matrix(
+                (npz["data"], npz["indices"], npz["indptr"]),
+                shape=tuple(npz["shape"]),
+            ),
+            "customers": pd.Index(npz["customers"]),
+            "products": npz["products"].astype(object),
+            "popular_products": npz["popular_products"].tolist(),
+            "row_order": npz["row_order"],
+            "row_offsets": npz["row_offsets"],
+        }
+
+
+def _preprocess_data(transaction_data, matrix_data=None, customer_stats=None):
+    """Derive the customer-product matrix and customer aggregates"""
+    # Deferred so the UI import path only pays for sklearn once data arrives
+    from sklearn import config_context
+    from sklearn.preprocessing import normalize
+
+    if matrix_data is None:
+        matrix_data = _build_matrix(transaction_data)
+    customer_product_matrix = matrix_data["customer_product_matrix"]
+    if customer_stats is None:
+        customer_stats = _compute_customer_stats(
+            transaction_data,
+            customer_product_matrix,
+            matrix_data["customers"],
+            matrix_data["products"],
+        )
+    # Unit-length rows turn a cosine similarity query into one sparse matmul;
+    # float32 halves the bytes each query streams through. astype already
+    # returns a fresh matrix, so normalize in place rather than copy again.
+    # Counts are always finite, so skip sklearn's NaN/inf validation pass
+    with config_context(assume_finite=True):
+        normalized_matrix = normalize(
+            customer_product_matrix.astype(np.float32), norm="l2", copy=False
+        )
+    return {
+        "transaction_data": transaction_data,
+        # Two flat arrays rather than one array per customer, so unpickling the
+        # cached result on each rerun stays cheap
+        "row_order": matrix_data["row_order"],
+        "row_offsets": matrix_data["row_offsets"],
+        "customer_product_matrix": customer_product_matrix,
+        "customers": matrix_data["customers"],
+        "products": matrix_data["products"],
+        "popular_products": matrix_data["popular_products"],
+        "normalized_matrix": normalized_matrix,
+        "customer_stats": customer_stats,
+    }
+
+
+def _score_products(data, indices, indptr, neighbours, used_mask, top_n):
+    """Rank unused products by their summed counts over the neighbour rows"""
+    # Written as plain loops over the CSR arrays so numba can compile it;
+    # ties go to the lower product code, matching a stable descending sort
+    scores = np.zeros(used_mask.shape[0])
+    for row in neighbours:
+        for k in range(indptr[row], indptr[row + 1]):
+            scores[indices[k]] += data[k]
+
+    taken = used_mask.copy()
+    ranked = np.empty(max(0, min(top_n, len(taken) - taken.sum())), dtype=np.int64)
+    for i in range(len(ranked)):
+        best = -1
+        for j in range(len(scores)):
+            if not taken[j] and (best < 0 or scores[j] > scores[best]):
+                best = j
+        ranked[i] = best
+        taken[best] = True
+    return ranked
+
+
+def _merge_top_k(best_scores, best_codes, rows, scores, codes, k):
+    """Fold a block of candidate similarities into the running per-row top-k"""
+    merged_scores = np.concatenate([best_scores[rows], scores], axis=1)
+    merged_codes = np.concatenate(
+        [best_codes[rows], np.broadcast_to(codes, scores.shape)], axis=1
+    )
+    top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+    best_scores[rows] = np.take_along_axis(merged_scores, top, axis=1)
+    best_codes[rows] = np.take_along_axis(merged_codes, top, axis=1)
+
+
+def _dense_row(matrix, row):
+    """Densify one CSR row straight from its index arrays, skipping scipy slicing"""
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    dense = np.zeros(matrix.shape[1], dtype=matrix.dtype)
+    dense[matrix.indices[start:end]] = matrix.data[start:end]
+    return dense
+
+
+@st.cache_resource(show_spinner=False)
+def _compiled_product_scorer():
+    """numba-compiled _score_products, or None when numba is unavailable"""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+
+    try:
+        scorer = njit(cache=True)(_score_products)
+        # Compile once up front with the dtypes the CSR matrix uses
+        scorer(
+            np.ones(1, dtype=np.int32),
+            np.zeros(1, dtype=np.int32),
+            np.array([0, 1], dtype=np.int32),
+            np.zeros(1, dtype=np.intp),
+            np.zeros(1, dtype=np.bool_),
+            1,
+        )
+    except Exception as e:
+        # e.g. an unwritable cache directory; the NumPy path still works
+        print(f"Error compiling product scorer: {str(e)}")
+        return None
+    return scorer
+
+
+def _write_parquet_atomic(frame, path):
+    """Write a parquet file so readers never observe a partially written one"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        frame.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_transactions(file_bytes):
+    """Parse the uploaded CSV with the fixed column types"""
+    transaction_data = pd.read_csv(
+        BytesIO(file_bytes),
+        engine="pyarrow",
+        dtype=TRANSACTION_DTYPES,
+        parse_dates=["timestamp"],
+    )
+    # Rows without a customer cannot be attributed, and pivot_table dropped
+    # them too; the remaining ids are plain integers for the matrix build
+    if transaction_data["customer_ID"].hasnans:
+        transaction_data = transaction_data.dropna(subset=["customer_ID"])
+        transaction_data = transaction_data.reset_index(drop=True)
+    transaction_data["customer_ID"] = transaction_data["customer_ID"].astype("int64")
+    return transaction_data
+
+
+def _prune_artifact_cache(keep):
+    """Delete cached uploads beyond the newest `keep`, by last use"""
+    last_used = {}
+    for entry in os.scandir(ARTIFACT_CACHE_DIR):
+        if entry.name.endswith(_ARTIFACT_SUFFIXES):
+            key = entry.name.split(".", 1)[0]
+            mtime = entry.stat().st_mtime
+            last_used[key] = max(last_used.get(key, mtime), mtime)
+    for key in sorted(last_used, key=last_used.get, reverse=True)[keep:]:
+        for suffix in _ARTIFACT_SUFFIXES:
+            try:
+                os.remove(os.path.join(ARTIFACT_CACHE_DIR, key + suffix))
+            except FileNotFoundError:
+                pass
+
+
+@st.cache_data(show_spinner=False)
+def _load_and_prepare(file_bytes):
+    """Parse an uploaded CSV and precompute everything the recommender needs"""
+    if ARTIFACT_CACHE_DIR is None:
+        return _preprocess_data(_read_transactions(file_bytes))
+
+    # Column types and the artifact format version are part of the key so a
+    # schema or layout change never reuses stale files
+    digest = hashlib.sha256(
+        repr((ARTIFACT_CACHE_VERSION, TRANSACTION_DTYPES)).encode() + file_bytes
+    )
+    key = digest.hexdigest()[:16]
+    transactions_path = os.path.join(ARTIFACT_CACHE_DIR, f"{key}.transactions.parquet")
+    stats_path = os.path.join(ARTIFACT_CACHE_DIR, f"{key}.customer_stats.parquet")
+    matrix_path = os.path.join(ARTIFACT_CACHE_DIR, f"{key}.matrix.npz")
+
+    if all(os.path.exists(p) for p in (transactions_path, stats_path, matrix_path)):
+        try:
+            data = _preprocess_data(
+                pd.read_parquet(transactions_path),
+                matrix_data=_load_matrix(matrix_path),
+                customer_stats=pd.read_parquet(stats_path),
+            )
+            # Mark as recently used so pruning evicts other uploads first
+            os.utime(matrix_path)
+            return data
+        except Exception as e:
+            print(f"Error reading cached artifacts: {str(e)}")
+
+    transaction_data = _read_transactions(file_bytes)
+    matrix_data = _build_matrix(transaction_data)
+    data = _preprocess_data(transaction_data, matrix_data=matrix_data)
+
+    try:
+        os.makedirs(ARTIFACT_CACHE_DIR, exist_ok=True)
+        _save_matrix(matrix_data, matrix_path)
+        _write_parquet_atomic(data["customer_stats"], stats_path)
+        _write_parquet_atomic(data["transaction_data"], transactions_path)
+        _prune_artifact_cache(ARTIFACT_CACHE_MAX_UPLOADS)
+    except Exception as e:
+        print(f"Error writing cached artifacts: {str(e)}")
+    return data
+
+
+@st.cache_resource(show_spinner=False)
+def _create_azure_openai_client(api_key, api_version, azure_endpoint, deployment_name):
+    """Azure OpenAI client shared across reruns so its connection pool is reused"""
+    from openai import AzureOpenAI
+
+    return AzureOpenAI(
+        api_key=api_key,
+        api_version=api_version,
+        azure_endpoint=azure_endpoint,
+        azure_deployment=deployment_name,
+        # Batch generation fires many requests at once; let the SDK back off
+        # exponentially on 429s and timeouts instead of failing the message
+        max_retries=LLM_MAX_RETRIES,
+        timeout=LLM_TIMEOUT_SECONDS,
+    )
+
+
+_PROMPT_TEMPLATE = Template("""Generate a banking recommendation message for:
+            - Tenure: $tenure years
+            - Transactions: $freq/month
+            - Favorite Product: $fav
+            Recommend: $recommended
+            """)
+
+
+def _build_prompt(tenure, freq, fav, recommended_products):
+    """Build the LLM prompt from plain values so it can serve as a cache key"""
+    return _PROMPT_TEMPLATE.substitute(
+        tenure=f"{tenure:.1f}",
+        freq=f"{freq:.1f}",
+        fav=fav,
+        recommended=", ".join(recommended_products),
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_llm(_openai_client, prompt, model="gpt-3.5-turbo"):
+    """Chat completion for a prompt, cached so reruns of the same batch skip the API"""
+    response = _openai_client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+    )
+    return response.choices[0].message.content
 
 
 class BankingRecommendationSystem:
     def __init__(self):
         self.transaction_data = None
         self.customer_product_matrix = None
+        self.customer_stats = None
         self.openai_client = None
+        self._normalized = None
+        self._customers = None
+        self._products = None
+        self._row_order = None
+        self._row_offsets = None
+        self._popular_products = None
+        self._product_scorer = None
 
     def load_data(self, uploaded_file=None):
         """Load and preprocess transaction data"""
         if uploaded_file is not None:
-            self.transaction_data = pd.read_csv(uploaded_file)
-            self.transaction_data["timestamp"] = pd.to_datetime(
-                self.transaction_data["timestamp"]
-            )
-            self._preprocess_data()
+            try:
+                # Cached on the file contents, so widget reruns skip parsing entirely
+                data = _load_and_prepare(uploaded_file.getvalue())
+            except Exception as e:
+                print(f"Error loading data: {str(e)}")
+                st.error(f"Could not read the uploaded CSV: {str(e)}")
+                self.transaction_data = None
+                return
+            self.transaction_data = data["transaction_data"]
+            self.customer_product_matrix = data["customer_product_matrix"]
+            self.customer_stats = data["customer_stats"]
+            self._normalized = data["normalized_matrix"]
+            self._customers = data["customers"]
+            self._products = data["products"]
+            self._row_order = data["row_order"]
+            self._row_offsets = data["row_offsets"]
+            self._popular_products = data["popular_products"]
+            self._product_scorer = _compiled_product_scorer()
         else:
             st.write("No data uploaded. Please upload a CSV file.")
 
-    def _preprocess_data(self):
-        self.customer_product_matrix = self.transaction_data.pivot_table(
-            index="customer_ID",
-            columns="product_used",
-            values="transaction_amount",
-            aggfunc="count",
-            fill_value=0,
-        )
+    def get_customer_data(self, customer_id):
+        """Return the transactions of a single customer"""
+        customer_idx = self._customers.get_loc(customer_id)
+        start, end = self._row_offsets[customer_idx : customer_idx + 2]
+        return self.transaction_data.take(self._row_order[start:end])
 
     def get_recommendations(self, customer_id, top_n=3):
         """Get recommendations for a customer with fallback logic"""
-        if customer_id in self.customer_product_matrix.index:
+        if customer_id in self._customers:
             recommendations = self._collaborative_filtering(customer_id, top_n)
             # If collaborative filtering returns too few results, supplement with popular products
             if len(recommendations) < top_n:
@@ -100,39 +513,58 @@ class BankingRecommendationSystem:
     def _collaborative_filtering(self, customer_id, top_n):
         """Improved collaborative filtering with fallback"""
         try:
-            # Get products used by similar customers
-            similarity_matrix = cosine_similarity(self.customer_product_matrix)
-            similarity_df = pd.DataFrame(
-                similarity_matrix,
-                index=self.customer_product_matrix.index,
-                columns=self.customer_product_matrix.index,
-            )
+            customer_idx = self._customers.get_loc(customer_id)
+            matrix = self.customer_product_matrix
+            if matrix.indptr[customer_idx] == matrix.indptr[customer_idx + 1]:
+                # No recorded products, so treat them like an unknown customer
+                return self._cold_start_recommendations(top_n)
+
+            # Cosine similarity of this customer against everyone else
+            query = _dense_row(self._normalized, customer_idx)
+            similarities = self._normalized @ query
 
             # Find similar customers (excluding self)
-            similar_customers = (
-                similarity_df[customer_id].sort_values(ascending=False).index[1:6]
-            )  # Top 5 similar
-
-            # Get products used by similar customers
-            similar_products = (
-                self.customer_product_matrix.loc[similar_customers]
-                .sum()
-                .sort_values(ascending=False)
-            )
+            similarities[customer_idx] = -np.inf
+            n_similar = min(5, len(similarities) - 1)  # Top 5 similar
+            partitioned = np.argpartition(-similarities, n_similar - 1)
+            similar_customers = partitioned[:n_similar]
 
             # Filter out products already used by the customer
-            used_products = set(
-                self.customer_product_matrix.loc[customer_id][
-                    self.customer_product_matrix.loc[customer_id] > 0
-                ].index
-            )
+            used = _dense_row(matrix, customer_idx) > 0
+
+            if self._product_scorer is not None:
+                ranked = self._product_scorer(
+                    matrix.data,
+                    matrix.indices,
+                    matrix.indptr,
+                    similar_customers,
+                    used,
+                    top_n,
+                )
+            else:
+                # Get products used by similar customers. Only the neighbours'
+                # nonzero columns are touched; np.unique returns them in code order
+                neighbour_rows = matrix[similar_customers]
+                codes, inverse = np.unique(neighbour_rows.indices, return_inverse=True)
+                product_counts = np.bincount(inverse, weights=neighbour_rows.data)
+                candidates = (
+                    (code, count)
+                    for code, count in zip(codes.tolist(), product_counts.tolist())
+                    if not used[code]
+                )
 
-            # Get top N recommendations excluding used products
-            recommendations = [
-                product
-                for product in similar_products.index
-                if product not in used_products
-            ][:top_n]
+                # Get top N recommendations excluding used products. nlargest is
+                # stable, so ties keep code order like the numba scorer
+                ranked = [
+                    code
+                    for code, _ in heapq.nlargest(top_n, candidates, key=itemgetter(1))
+                ]
+                if len(ranked) < top_n:
+                    # Products no neighbour used all score zero; take lowest codes
+                    unused = np.flatnonzero(~used)
+                    spare = unused[~np.isin(unused, codes)]
+                    ranked.extend(spare[: top_n - len(ranked)].tolist())
+            recommendations = self._products[ranked].tolist()
 
             return recommendations
 
@@ -140,18 +572,58 @@ class BankingRecommendationSystem:
             print(f"Error in collaborative filtering: {str(e)}")
             return self._cold_start_recommendations(top_n)
 
+    def nearest_neighbours(self, k=5, block_size=1024):
+        """Top-k most similar customers for every customer, for offline batch jobs
+
+        Returns (codes, scores): int32 and float32 arrays of shape (n_customers, k)
+        sorted by descending similarity, where codes index ``self._customers``.
+        """
+        normalized = self._normalized
+        n_customers = normalized.shape[0]
+        k = min(k, n_customers - 1)
+        best_scores = np.full((n_customers, k), -np.inf, dtype=np.float32)
+        best_codes = np.full((n_customers, k), -1, dtype=np.int32)
+        if k <= 0:
+            return best_codes, best_scores
+
+        # Similarity is symmetric, so only tiles on or above the diagonal are
+        # computed; each off-diagonal tile updates both of its row ranges. Row
+        # ranges are contiguous, so plain slices avoid fancy-index CSR gathers
+        for a in range(0, n_customers, block_size):
+            rows_a = slice(a, min(a + block_size, n_customers))
+            block_a = normalized[rows_a]
+            codes_a = np.arange(rows_a.start, rows_a.stop, dtype=np.int32)
+            for b in range(a, n_customers, block_size):
+                rows_b = slice(b, min(b + block_size, n_customers))
+                codes_b = np.arange(rows_b.start, rows_b.stop, dtype=np.int32)
+                tile = (block_a @ normalized[rows_b].T).toarray()
+                if a == b:
+                    np.fill_diagonal(tile, -np.inf)  # exclude self
+                _merge_top_k(best_scores, best_codes, rows_a, tile, codes_b, k)
+                if a != b:
+                    _merge_top_k(best_scores, best_codes, rows_b, tile.T, codes_a, k)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_codes, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
+
     def _cold_start_recommendations(self, top_n):
         """Get popular products with fallback to all products"""
         try:
-            popular_products = (
-                self.transaction_data["product_used"].value_counts().index
-            )
-            return list(popular_products[:top_n])
+            return self._popular_products[:top_n]
         except Exception:
             # Fallback to all products if no transaction data
-            return [product["name"] for product in BANKING_PRODUCTS][:top_n]
+            return list(_BANKING_PRODUCT_NAMES[:top_n])
 
     def get_azure_openai_client(self):
+        """Return the Azure OpenAI API client, creating it on first use"""
+        if self.openai_client is None:
+            self.openai_client = self._build_azure_openai_client()
+        return self.openai_client
+
+    def _build_azure_openai_client(self):
         """Initialize and return the Azure OpenAI API client using st.secrets (local/Streamlit) or os.environ (Azure deployment)."""
 
         # Try st.secrets first, then fallback to os.environ
@@ -174,32 +646,42 @@ class BankingRecommendationSystem:
                 "Azure OpenAI configuration missing. Please set your API key, endpoint, and deployment name in .streamlit/secrets.toml or as environment variables."
             )
             return None
-        return AzureOpenAI(
-            api_key=api_key,
-            api_version=api_version,
-            azure_endpoint=azure_endpoint,
-            azure_deployment=deployment_name,
+        return _create_azure_openai_client(
+            api_key, api_version, azure_endpoint, deployment_name
         )
 
-    def generate_message(self, customer_data, recommended_products):
+    def generate_message(self, customer_id, recommended_products):
         """Generate personalized message with proper error handling using Azure OpenAI client from get_azure_openai_client."""
         openai_client = self.get_azure_openai_client()
         if not openai_client:
             return "Enable AI messaging by setting API key and Azure OpenAI config"
+        return self._request_message(openai_client, customer_id, recommended_products)
+
+    def generate_messages_batch(self, pairs, max_workers=8):
+        """Generate messages for (customer_id, recommended_products) pairs concurrently, preserving order"""
+        openai_client = self.get_azure_openai_client()
+        if not openai_client:
+            return [
+                "Enable AI messaging by setting API key and Azure OpenAI config"
+            ] * len(pairs)
+
+        # Each call is a blocking HTTPS round-trip, so overlap them in threads
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda pair: self._request_message(openai_client, *pair), pairs
+                )
+            )
 
+    def _request_message(self, openai_client, customer_id, recommended_products):
         try:
-            prompt = f"""Generate a banking recommendation message for:
-            - Tenure: {customer_data['customer_tenure'].mean():.1f} years
-            - Transactions: {customer_data['transaction_frequency'].mean():.1f}/month
-            - Favorite Product: {customer_data['product_used'].mode()[0]}
-            Recommend: {', '.join(recommended_products)}
-            """
-
-            response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
+            stats = self.customer_stats.loc[customer_id]
+            prompt = _build_prompt(
+                stats["tenure"],
+                stats["freq"],
+                stats["fav"],
+                tuple(recommended_products),
             )
-            return response.choices[0].message.content
+            return _cached_llm(openai_client, prompt)
         except Exception as e:
             return f"AI Message Error: {str(e)}"
@@ -0,0 +1,64 @@
+"""Check BankingRecommendationSystem.nearest_neighbours against brute force
+
+Run from the repository root: python scripts/check_nearest_neighbours.py
+"""
+
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banking_recommender import (  # noqa: E402
+    BankingRecommendationSystem,
+    _BANKING_PRODUCT_NAMES,
+)
+
+
+def _synthetic_upload(n_customers=300, n_rows=3000, seed=0):
+    """A random transactions CSV with the columns the app expects"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "customer_ID": rng.integers(1, n_customers + 1, n_rows),
+            "timestamp": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D"),
+            "transaction_type": rng.choice(["deposit", "transfer"], n_rows),
+            "transaction_amount": rng.uniform(1, 500, n_rows).round(2),
+            "product_used": rng.choice(_BANKING_PRODUCT_NAMES, n_rows),
+            "customer_tenure": rng.integers(0, 20, n_rows),
+            "transaction_frequency": rng.integers(1, 30, n_rows),
+        }
+    )
+    return BytesIO(frame.to_csv(index=False).encode())
+
+
+def main():
+    recommender = BankingRecommendationSystem()
+    recommender.load_data(_synthetic_upload())
+
+    dense = recommender._normalized.toarray()
+    similarities = dense @ dense.T
+    np.fill_diagonal(similarities, -np.inf)
+    expected = -np.sort(-similarities, axis=1)
+
+    for k in (1, 5, 12):
+        for block_size in (7, 32, 64, 1024):
+            codes, scores = recommender.nearest_neighbours(k=k, block_size=block_size)
+            rows = np.arange(len(codes))[:, None]
+            assert codes.dtype == np.int32 and scores.dtype == np.float32
+            assert not (codes == rows).any(), "a customer is its own neighbour"
+            # Ties make the codes ambiguous, so check the scores are the true
+            # top-k and that each code really has the score reported for it
+            np.testing.assert_allclose(scores, expected[:, :k], rtol=1e-5, atol=1e-6)
+            np.testing.assert_allclose(
+                similarities[rows, codes], scores, rtol=1e-5, atol=1e-6
+            )
+    print("nearest_neighbours matches brute force")
+
+
+if __name__ == "__main__":
+    main()
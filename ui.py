@@ -0,0 +1,174 @@
+import time
+
+import streamlit as st
+
+
+class BankingUI:
+    def __init__(self, recommender):
+        self.recommender = recommender
+
+    def _customer_profile_card(self, customer_id):
+        """Display customer profile with formatted datetime"""
+        stats = self.recommender.customer_stats.loc[customer_id]
+        customer_data = self.recommender.get_customer_data(customer_id)
+        with st.container(border=True):
+            st.subheader("👤 Customer Profile")
+            cols = st.columns(3)
+            cols[0].metric("Tenure", f"{stats['tenure']:.1f} years")
+            cols[1].metric("Monthly Transactions", f"{stats['freq']:.1f}")
+            cols[2].metric("Favorite Product", stats["fav"])
+
+            st.write("📝 **Recent Transactions**")
+            # Slice before formatting so only the displayed rows are copied
+            formatted_data = (
+                customer_data[
+                    [
+                        "timestamp",
+                        "transaction_type",
+                        "transaction_amount",
+                        "product_used",
+                    ]
+                ]
+                .head(10)
+                .copy()
+            )
+            formatted_data["timestamp"] = formatted_data["timestamp"].dt.strftime(
+                "%Y-%m-%d %H:%M"
+            )
+            st.dataframe(
+                formatted_data,
+                hide_index=True,
+                use_container_width=True,
+            )
+
+    def _recommendations_table(self, recommendations_df):
+        """Display recommendations with proper product formatting"""
+        with st.container(border=True):
+            st.subheader("📊 Batch Recommendations")
+            st.dataframe(
+                recommendations_df,
+                column_config={
+                    "Recommended Products": st.column_config.TextColumn(
+                        "Recommendations", width="medium"
+                    ),
+                    "Personalized Message": st.column_config.TextColumn(
+                        "Message", width="large"
+                    ),
+                },
+                use_container_width=True,
+                hide_index=True,
+            )
+
+    @st.fragment
+    def _single_customer_panel(self):
+        """Profile and recommendations for one customer, rerun on its own"""
+        # Display recommendations for selected customer
+        customer_ids = self.recommender.transaction_data["customer_ID"].unique()
+        selected_id = st.selectbox("Select Customer", customer_ids)
+
+        self._customer_profile_card(selected_id)
+
+        # Display recommendations
+        with st.container(border=True):
+            st.subheader("🎯 Personalized Recommendations")
+            recommendations = self.recommender.get_recommendations(selected_id)
+
+            # ensure that we get recommendations
+            if not recommendations:
+                st.warning(
+                    "No specific recommendations found. Showing popular products instead."
+                )
+                recommendations = self.recommender._cold_start_recommendations(3)
+
+            message = self.recommender.generate_message(selected_id, recommendations)
+
+            cols = st.columns([1, 2])
+            with cols[0]:
+                st.write("**Recommended Products**")
+                if recommendations:
+                    for product in recommendations:
+                        st.success(f"🌟 {product.replace('_', ' ').title()}")
+                else:
+                    st.warning("No recommendations available")
+
+            with cols[1]:
+                st.write("**AI-Powered Message**")
+                st.write(message)
+
+    @st.fragment
+    def _batch_panel(self, num_customers, max_workers):
+        """Batch recommendations, rerun on its own when the button is pressed"""
+        if st.button("🚀 Generate Batch Recommendations", use_container_width=True):
+            with st.spinner("Generating recommendations..."):
+                start_time = time.time()
+                customer_ids = self.recommender.transaction_data[
+                    "customer_ID"
+                ].unique()[:num_customers]
+                recommendations = {
+                    cid: self.recommender.get_recommendations(cid)
+                    for cid in customer_ids
+                }
+
+                results = (
+                    self.recommender.customer_stats.loc[
+                        customer_ids, ["tenure", "freq"]
+                    ]
+                    .rename(columns={"tenure": "Tenure", "freq": "Transaction Freq"})
+                    .rename_axis("Customer ID")
+                    .reset_index()
+                )
+                results.insert(
+                    1,
+                    "Recommended Products",
+                    results["Customer ID"].map(
+                        lambda cid: "\n".join(
+                            p.replace("_", " ").title() for p in recommendations[cid]
+                        )
+                    ),
+                )
+                results.insert(
+                    2,
+                    "Personalized Message",
+                    self.recommender.generate_messages_batch(
+                        list(recommendations.items()), max_workers=max_workers
+                    ),
+                )
+
+                self._recommendations_table(results)
+                st.toast(
+                    f"Generated {len(results)} recommendations in {time.time()-start_time:.2f}s",
+                    icon="✅",
+                )
+
+    def show_main_interface(self):
+        with st.sidebar:
+            st.header("⚙️ Settings")
+            uploaded_file = st.file_uploader(
+                "Upload transaction data (CSV)", type="csv"
+            )
+            self.recommender.load_data(uploaded_file)
+
+            num_customers = st.slider(
+                "Number of Customers to Process",
+                1,
+                100,
+                10,
+                help="Select how many customer recommendations to generate",
+            )
+            max_workers = st.slider(
+                "Concurrent LLM calls",
+                1,
+                32,
+                8,
+                help="Upper bound on parallel Azure OpenAI requests during batch generation",
+            )
+
+        st.title("🏦 Smart Banking Recommendations")
+        st.caption(
+            "AI-powered product recommendations for personalized banking experiences"
+        )
+        if self.recommender.transaction_data is not None:
+            self._single_customer_panel()
+            self._batch_panel(num_customers, max_workers)
+        else:
+            st.write("No data uploaded. Please upload a CSV file.")